@@ -5,39 +5,87 @@ Monitors user activity and intervenes when working unhealthy late hours
 """
 
 import json
+import logging
+import os
+import queue
 import time
 import threading
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 import psutil
 from pynput import keyboard
 from plyer import notification
 
+# Try to import orjson for faster stats serialization
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+log = logging.getLogger("sleepguard")
+
+def dumps_json(data):
+    """Serialize data to indented JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode()
+
 class SleepGuardDaemon:
-    def __init__(self, config_path="config.json", stats_path="stats.json"):
+    def __init__(self, config_path="config.json", stats_path="stats.json",
+                 session_path="session_info.json"):
         """Initialize the SleepGuard daemon"""
         self.config_path = config_path
         self.stats_path = stats_path
+        self.session_path = session_path
         
         # Load configuration
         self.config = self.load_config()
+        self.apply_log_level()
+        
+        # Cache config values read on hot paths
+        self._bedtime = self.config.get('bedtime_hour', 23)
+        self._max_session = self.config.get('max_session_hours', 4)
+        if not isinstance(self._max_session, (int, float)) or self._max_session <= 0:
+            log.warning("Invalid max_session_hours %r, using 4", self._max_session)
+            self._max_session = 4
+        self._window = self.config.get('keystroke_window_seconds', 60)
+        self._save_interval = self.config.get('save_interval_seconds', 60)
+        # Highest threshold first so the most severe crossed level wins
+        self._levels = tuple(sorted(
+            self.config.get('notification_levels', [30, 60, 90]), reverse=True
+        ))
+        self._score = self.make_scorer(self._bedtime, self._max_session)
         
         # Initialize tracking variables
+        # Wall-clock start for display, monotonic start for elapsed time
         self.session_start = datetime.now()
+        self._session_start_mono = time.monotonic()
         self.keystroke_count = 0
-        self.last_keystroke_time = datetime.now()
-        self.keystroke_history = []  # Store timestamps of keystrokes
+        self.last_keystroke_time = self._session_start_mono
+        # Keystroke timestamps queued by the listener thread, drained by the monitor thread
+        self._pending = queue.SimpleQueue()
+        # Ring of per-second keystroke counts covering the rate window
+        self._buckets = [0] * max(1, int(self._window))
+        self._bucket_sec = int(self._session_start_mono)  # second of the newest bucket
         self.fatigue_score = 0
         self.last_notification_level = 0
         
-        # Lock for thread-safe operations
+        # Lock for stats file writes; keystrokes reach the monitor thread through
+        # the pending queue, so the buckets need no locking
         self.lock = threading.Lock()
         
         # Running flag
         self.running = True
         
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] SleepGuard Daemon initialized")
-        print(f"Session started at: {self.session_start.strftime('%H:%M:%S')}")
+        # Prime CPU sampling so later non-blocking calls report usage since the last call
+        psutil.cpu_percent(interval=None)
+        
+        self.save_session_info()
+        
+        log.info("SleepGuard Daemon initialized")
+        start = self.session_start
+        log.info("Session started at: %02d:%02d:%02d", start.hour, start.minute, start.second)
     
     def load_config(self):
         """Load configuration from JSON file"""
@@ -53,75 +101,104 @@ class SleepGuardDaemon:
                     "max_session_hours": 4,
                     "notification_levels": [30, 60, 90],
                     "keystroke_window_seconds": 60,
-                    "save_interval_seconds": 60
+                    "save_interval_seconds": 60,
+                    "log_level": "INFO"
                 }
                 with open(self.config_path, 'w') as f:
                     json.dump(default_config, f, indent=4)
-                print(f"Created default config at {self.config_path}")
+                log.info("Created default config at %s", self.config_path)
                 return default_config
         except Exception as e:
-            print(f"Error loading config: {e}")
+            log.error("Error loading config: %s", e)
             return {}
     
+    def apply_log_level(self):
+        """Set the daemon logger's level from the log_level config option"""
+        level = self.config.get('log_level')
+        if level is None:
+            return
+        # Numeric levels are passed through; names are case-insensitive
+        try:
+            log.setLevel(level.upper() if isinstance(level, str) else level)
+        except (TypeError, ValueError):
+            log.warning("Invalid log_level %r, keeping %s",
+                        level, logging.getLevelName(log.getEffectiveLevel()))
+    
     def on_press(self, key):
         """Callback for keyboard press events"""
-        with self.lock:
-            self.keystroke_count += 1
-            current_time = datetime.now()
-            self.last_keystroke_time = current_time
-            self.keystroke_history.append(current_time)
+        # Counting happens when the monitor thread drains the queue
+        self._pending.put_nowait(time.monotonic())
+    
+    def drain_keystrokes(self):
+        """Move queued keystrokes into the counters and buckets (monitor thread only)"""
+        pending = self._pending
+        buckets = self._buckets
+        size = len(buckets)
+        drained = 0
+        while True:
+            try:
+                now = pending.get_nowait()
+            except queue.Empty:
+                break
+            drained += 1
+            sec = int(now)
             
-            # Keep only recent keystrokes (last minute)
-            cutoff_time = current_time - timedelta(
-                seconds=self.config.get('keystroke_window_seconds', 60)
-            )
-            self.keystroke_history = [
-                t for t in self.keystroke_history if t > cutoff_time
-            ]
+            # Clear buckets for the seconds skipped since the last keystroke
+            if sec > self._bucket_sec:
+                if sec - self._bucket_sec >= size:
+                    buckets[:] = [0] * size
+                else:
+                    for skipped in range(self._bucket_sec + 1, sec + 1):
+                        buckets[skipped % size] = 0
+                self._bucket_sec = sec
+            elif self._bucket_sec - sec >= size:
+                # Already outside the window; its bucket now belongs to a newer second
+                continue
+            buckets[sec % size] += 1
+        
+        if drained:
+            self.keystroke_count += drained
+            self.last_keystroke_time = now
     
-    def calculate_fatigue_score(self):
+    @staticmethod
+    def make_scorer(bedtime, max_session):
         """
-        Calculate fatigue score (0-100) based on multiple factors:
-        1. Time of day (30 points max)
-        2. Session duration (40 points max)
-        3. Keystroke rate decline (30 points max)
+        Build a fatigue scoring function specialized for the given config.
+        Per-hour time scores are precomputed so each call is just lookups.
         """
-        current_time = datetime.now()
-        current_hour = current_time.hour
-        
-        # Factor 1: Time of day scoring
-        time_score = 0
-        bedtime = self.config.get('bedtime_hour', 23)
-        critical_hour = self.config.get('critical_hour', 2)
+        # Factor 1: Time of day scoring, one entry per hour
+        hour_scores = []
+        for hour in range(24):
+            time_score = 0
+            if hour >= bedtime or hour < 6:
+                # Late night hours
+                if hour >= bedtime:
+                    hours_past_bedtime = hour - bedtime
+                else:
+                    # After midnight
+                    hours_past_bedtime = (24 - bedtime) + hour
+                
+                time_score = min(30, hours_past_bedtime * 7)
+            hour_scores.append(time_score)
+        hour_scores = tuple(hour_scores)
+        duration_scale = 40 / max_session
         
-        if current_hour >= bedtime or current_hour < 6:
-            # Late night hours
-            if current_hour >= bedtime:
-                hours_past_bedtime = current_hour - bedtime
-            else:
-                # After midnight
-                hours_past_bedtime = (24 - bedtime) + current_hour
+        def score(current_hour, session_duration, current_rate):
+            time_score = hour_scores[current_hour]
             
-            time_score = min(30, hours_past_bedtime * 7)
-        
-        # Factor 2: Session duration scoring
-        session_duration = (current_time - self.session_start).total_seconds() / 3600
-        max_session = self.config.get('max_session_hours', 4)
-        
-        if session_duration > 1:
-            duration_score = min(40, (session_duration / max_session) * 40)
-        else:
-            duration_score = 0
-        
-        # Factor 3: Keystroke rate scoring
-        keystroke_rate_score = 0
-        if len(self.keystroke_history) > 0:
-            # Calculate current keystroke rate (keystrokes per minute)
-            current_rate = len(self.keystroke_history)
+            # Factor 2: Session duration scoring
+            if session_duration > 1:
+                duration_score = min(40, session_duration * duration_scale)
+            else:
+                duration_score = 0
             
+            # Factor 3: Keystroke rate scoring
             # Expected normal rate: 60-120 keystrokes per minute when active
             # Lower rate indicates fatigue
-            if current_rate < 30:
+            if current_rate <= 0:
+                # No recent activity
+                keystroke_rate_score = 25
+            elif current_rate < 30:
                 # Very low activity
                 keystroke_rate_score = 30
             elif current_rate < 60:
@@ -133,13 +210,25 @@ class SleepGuardDaemon:
             else:
                 # High activity (good)
                 keystroke_rate_score = 0
-        else:
-            # No recent activity
-            keystroke_rate_score = 25
+            
+            # Combine all scores
+            total_score = time_score + duration_score + keystroke_rate_score
+            return min(100, int(total_score))
         
-        # Combine all scores
-        total_score = time_score + duration_score + keystroke_rate_score
-        return min(100, int(total_score))
+        return score
+    
+    def calculate_fatigue_score(self):
+        """
+        Calculate fatigue score (0-100) based on multiple factors:
+        1. Time of day (30 points max)
+        2. Session duration (40 points max)
+        3. Keystroke rate decline (30 points max)
+        """
+        return self._score(
+            time.localtime().tm_hour,
+            (time.monotonic() - self._session_start_mono) / 3600,
+            self.get_keystroke_rate()
+        )
     
     def send_notification(self, fatigue_level):
         """Send desktop notification based on fatigue level"""
@@ -165,91 +254,137 @@ class SleepGuardDaemon:
                 app_name="SleepGuard",
                 timeout=timeout
             )
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] Notification sent: {title}")
+            log.info("Notification sent: %s", title)
         except Exception as e:
-            print(f"Error sending notification: {e}")
+            log.error("Error sending notification: %s", e)
+    
+    def check_notifications(self, current_score):
+        """Notify once for the highest newly crossed notification level"""
+        for level in self._levels:
+            if current_score >= level > self.last_notification_level:
+                self.send_notification(current_score)
+                self.last_notification_level = level
+                break
+        
+        # Reset notification level if fatigue decreases
+        if current_score < 30:
+            self.last_notification_level = 0
     
     def get_session_duration(self):
         """Get formatted session duration"""
-        duration = datetime.now() - self.session_start
-        hours = int(duration.total_seconds() // 3600)
-        minutes = int((duration.total_seconds() % 3600) // 60)
+        duration = time.monotonic() - self._session_start_mono
+        hours = int(duration // 3600)
+        minutes = int((duration % 3600) // 60)
         return f"{hours}h {minutes}m"
     
-    def get_keystroke_rate(self):
-        """Get current keystroke rate per minute"""
-        if len(self.keystroke_history) > 0:
-            return len(self.keystroke_history)
-        return 0
+    def get_keystroke_rate(self, now=None):
+        """Get current keystroke rate per minute, as of monotonic time now"""
+        self.drain_keystrokes()
+        buckets = self._buckets
+        size = len(buckets)
+        now_sec = int(time.monotonic() if now is None else now)
+        newest = self._bucket_sec
+        # Sum only buckets still inside the window; older ones may not be cleared yet
+        return sum(buckets[s % size] for s in range(max(newest, now_sec) - size + 1, newest + 1))
+    
+    def write_json(self, path, data):
+        """Atomically write data as JSON to path"""
+        payload = dumps_json(data)
+        # Write to a temp file and rename so readers never see partial JSON
+        tmp_path = path + ".tmp"
+        with self.lock:
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+    
+    def save_session_info(self):
+        """Save static session information once at startup"""
+        try:
+            self.write_json(self.session_path, {
+                "session_start": self.session_start.isoformat()
+            })
+        except Exception as e:
+            log.error("Error saving session info: %s", e)
     
     def save_stats(self):
         """Save current statistics to JSON file"""
         try:
-            with self.lock:
-                stats = {
-                    "timestamp": datetime.now().isoformat(),
-                    "session_start": self.session_start.isoformat(),
-                    "session_duration_seconds": (datetime.now() - self.session_start).total_seconds(),
-                    "total_keystrokes": self.keystroke_count,
-                    "current_keystroke_rate": self.get_keystroke_rate(),
-                    "fatigue_score": self.fatigue_score,
-                    "current_hour": datetime.now().hour,
-                    "system_info": {
-                        "cpu_percent": psutil.cpu_percent(interval=0.1),
-                        "memory_percent": psutil.virtual_memory().percent
-                    }
-                }
-            
-            with open(self.stats_path, 'w') as f:
-                json.dump(stats, f, indent=4)
+            # Rate first: it drains queued keystrokes into the total count
+            keystroke_rate = self.get_keystroke_rate()
+            keystroke_count = self.keystroke_count
+            # Only volatile fields; static ones live in the session info file
+            stats = {
+                "timestamp": datetime.now().isoformat(),
+                "total_keystrokes": keystroke_count,
+                "current_keystroke_rate": keystroke_rate,
+                "fatigue_score": self.fatigue_score,
+                "cpu_percent": psutil.cpu_percent(interval=None),
+                "memory_percent": psutil.virtual_memory().percent
+            }
+            self.write_json(self.stats_path, stats)
             
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] Stats saved - "
-                  f"Fatigue: {self.fatigue_score}%, "
-                  f"Keystrokes: {self.keystroke_count}, "
-                  f"Rate: {self.get_keystroke_rate()}/min")
+            log.info("Stats saved - Fatigue: %s%%, Keystrokes: %s, Rate: %s/min",
+                     self.fatigue_score, keystroke_count, keystroke_rate)
         except Exception as e:
-            print(f"Error saving stats: {e}")
+            log.error("Error saving stats: %s", e)
     
     def monitor_loop(self):
         """Main monitoring loop"""
-        last_save_time = datetime.now()
-        save_interval = self.config.get('save_interval_seconds', 60)
+        last_save_time = time.monotonic()
+        save_interval = self._save_interval
+        
+        # Only recompute when something could have changed the score:
+        # new keystrokes, an hour boundary, or a periodic idle refresh
+        recalc_interval = 30
+        last_calc_time = 0.0
+        last_count = -1
+        last_hour = -1
         
         while self.running:
             try:
-                # Calculate current fatigue score
-                with self.lock:
-                    self.fatigue_score = self.calculate_fatigue_score()
-                    current_score = self.fatigue_score
+                now = time.monotonic()
+                self.drain_keystrokes()
+                keystroke_count = self.keystroke_count
+                current_hour = time.localtime().tm_hour
+                active = keystroke_count != last_count
                 
-                # Check if we need to send notifications
-                notification_levels = self.config.get('notification_levels', [30, 60, 90])
-                for level in sorted(notification_levels):
-                    if current_score >= level and self.last_notification_level < level:
-                        self.send_notification(current_score)
-                        self.last_notification_level = level
-                        break
-                
-                # Reset notification level if fatigue decreases
-                if current_score < 30:
-                    self.last_notification_level = 0
+                if (active
+                        or current_hour != last_hour
+                        or now - last_calc_time >= recalc_interval):
+                    # Calculate current fatigue score
+                    current_score = self.calculate_fatigue_score()
+                    self.fatigue_score = current_score
+                    last_calc_time = now
+                    last_count = keystroke_count
+                    last_hour = current_hour
+                    
+                    # Check if we need to send notifications
+                    self.check_notifications(current_score)
                 
                 # Save stats periodically
-                if (datetime.now() - last_save_time).total_seconds() >= save_interval:
+                if now - last_save_time >= save_interval:
                     self.save_stats()
-                    last_save_time = datetime.now()
+                    last_save_time = now
                 
-                # Sleep for a short interval
-                time.sleep(5)
+                if active:
+                    # Keep a short tick while the user is typing
+                    time.sleep(5)
+                else:
+                    # Idle: nothing can change until the next recalculation or save
+                    next_wake = min(last_calc_time + recalc_interval,
+                                    last_save_time + save_interval)
+                    time.sleep(max(0, next_wake - time.monotonic()))
                 
             except Exception as e:
-                print(f"Error in monitor loop: {e}")
+                log.error("Error in monitor loop: %s", e)
                 time.sleep(5)
     
     def start(self):
         """Start the daemon"""
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] Starting SleepGuard Daemon...")
-        print("Press Ctrl+C to stop")
+        log.info("Starting SleepGuard Daemon...")
+        log.info("Press Ctrl+C to stop")
         
         # Start keyboard listener in a separate thread
         listener = keyboard.Listener(on_press=self.on_press)
@@ -259,12 +394,19 @@ class SleepGuardDaemon:
         try:
             self.monitor_loop()
         except KeyboardInterrupt:
-            print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Stopping SleepGuard Daemon...")
+            log.info("Stopping SleepGuard Daemon...")
             self.running = False
             listener.stop()
             self.save_stats()  # Final save
-            print("Daemon stopped successfully")
+            log.info("Daemon stopped successfully")
 
 if __name__ == "__main__":
+    # Timestamps are only formatted for records that are actually emitted;
+    # the log_level config option overrides this level for the daemon logger
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(asctime)s] %(message)s",
+        datefmt="%H:%M:%S"
+    )
     daemon = SleepGuardDaemon()
     daemon.start()
@@ -7,9 +7,10 @@ Displays live statistics from the SleepGuard daemon
 import json
 import time
 import os
+import shutil
 import sys
+import threading
 from datetime import datetime, timedelta
-from pathlib import Path
 
 # Try to import colorama for cross-platform colored output
 try:
@@ -26,14 +27,100 @@ except ImportError:
     class Style:
         BRIGHT = DIM = NORMAL = RESET_ALL = ""
 
+# Try to import watchdog to react to stats file changes instead of polling
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+if WATCHDOG_AVAILABLE:
+    class StatsFileHandler(FileSystemEventHandler):
+        """Set an event whenever the stats file is written or replaced"""
+        def __init__(self, path, changed):
+            super().__init__()
+            self.path = os.path.abspath(path)
+            self.changed = changed
+        
+        def check(self, path):
+            if os.path.abspath(path) == self.path:
+                self.changed.set()
+        
+        def on_modified(self, event):
+            self.check(event.src_path)
+        
+        def on_created(self, event):
+            self.check(event.src_path)
+        
+        def on_moved(self, event):
+            # Atomic saves show up as a move of the temp file onto the target
+            self.check(event.dest_path)
+
+# ANSI escape to clear the screen and move the cursor home, without spawning cls/clear
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+
+# Marker for "no frame drawn yet", distinct from a None (missing) stats result
+NOT_RENDERED = object()
+
+# Label of the dashboard line whose time value is refreshed in place
+CLOCK_LABEL = "Current Time: "
+
+# ASCII art logo, built once since it never changes
+LOGO = f"""
+{Fore.CYAN}{Style.BRIGHT}
+╔═══════════════════════════════════════════════════════════╗
+║                                                           ║
+║   ███████╗██╗     ███████╗███████╗██████╗  ██████╗       ║
+║   ██╔════╝██║     ██╔════╝██╔════╝██╔══██╗██╔════╝       ║
+║   ███████╗██║     █████╗  █████╗  ██████╔╝██║  ███╗      ║
+║   ╚════██║██║     ██╔══╝  ██╔══╝  ██╔═══╝ ██║   ██║      ║
+║   ███████║███████╗███████╗███████╗██║     ╚██████╔╝      ║
+║   ╚══════╝╚══════╝╚══════╝╚══════╝╚═╝      ╚═════╝       ║
+║                                                           ║
+║          Intelligent Productivity Protector               ║
+║                                                           ║
+╚═══════════════════════════════════════════════════════════╝
+{Style.RESET_ALL}
+"""
+
+# Widest dashboard line (the logo box); narrower terminals wrap the frame
+FRAME_WIDTH = max(len(line) for line in LOGO.splitlines() if "\x1b" not in line)
+
 class SleepGuardUI:
-    def __init__(self, stats_path="stats.json"):
+    def __init__(self, stats_path="stats.json", session_path="session_info.json"):
         self.stats_path = stats_path
+        self.session_path = session_path
         self.last_update = None
+        self._rendered_stats = NOT_RENDERED  # stats object shown by the last full frame
+        self._clock_visible = False
+        self._clock_row = 0  # 1-based screen row of the Current Time line
+        self._frame_height = 0  # rows the last frame occupies, cursor line included
+        self._cached_stats = None  # last parsed stats and the mtime they were read at
+        self._cached_mtime = None
+        self._session_info = {}  # static session info, re-read only when rewritten
+        self._session_mtime = None
+        
+        # Prebuilt static pieces of the dashboard, reused every frame
+        self._bars = {
+            length: tuple("█" * i + "░" * (length - i) for i in range(length + 1))
+            for length in (20, 30)
+        }
+        self._sep_eq = f"{Fore.CYAN}{'='*60}"
+        self._sep_dash = f"{Fore.CYAN}{'─'*60}"
+        self._header_lines = {
+            name: f"{self._sep_dash}\n{Fore.WHITE}{title}\n{self._sep_dash}"
+            for name, title in (
+                ("session", "📊 Session Statistics:"),
+                ("system", "💻 System Resources:"),
+                ("health", " Health Recommendations:"),
+            )
+        }
         
     def clear_screen(self):
         """Clear terminal screen (cross-platform)"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        sys.stdout.write(CLEAR_SCREEN)
+        sys.stdout.flush()
     
     def get_fatigue_color(self, score):
         """Get color based on fatigue score"""
@@ -66,68 +153,128 @@ class SleepGuardUI:
     
     def draw_progress_bar(self, value, max_value=100, length=30):
         """Draw a text-based progress bar"""
-        filled = int((value / max_value) * length)
-        bar = "█" * filled + "░" * (length - filled)
-        return bar
+        filled = max(0, min(length, int((value / max_value) * length)))
+        bars = self._bars.get(length)
+        if bars is None:
+            return "█" * filled + "░" * (length - filled)
+        return bars[filled]
     
-    def load_stats(self):
-        """Load statistics from JSON file"""
+    def get_stats_mtime(self):
+        """Get stats file modification time in nanoseconds, or None if missing"""
         try:
-            if Path(self.stats_path).exists():
+            return os.stat(self.stats_path).st_mtime_ns
+        except OSError:
+            return None
+    
+    def refresh_clock(self):
+        """
+        Redraw only the Current Time value of an already rendered dashboard.
+        Skipped when the frame doesn't fit the terminal, since it has then
+        scrolled or wrapped and its screen rows are unknown.
+        """
+        if not self._clock_visible:
+            return
+        size = shutil.get_terminal_size()
+        if size.lines < self._frame_height or size.columns < FRAME_WIDTH:
+            return
+        current_time = datetime.now().strftime('%H:%M:%S')
+        # Absolute cursor positioning, which colorama also translates on Windows
+        sys.stdout.write(f"\x1b[{self._clock_row};{len(CLOCK_LABEL) + 1}H"
+                         f"{Fore.YELLOW}{current_time}{Style.RESET_ALL}")
+        sys.stdout.flush()
+    
+    def load_session_info(self):
+        """Load static session info written once by the daemon at startup"""
+        try:
+            mtime = os.stat(self.session_path).st_mtime_ns
+            if mtime != self._session_mtime:
+                with open(self.session_path, 'r') as f:
+                    self._session_info = json.load(f)
+                self._session_mtime = mtime
+        except (OSError, ValueError):
+            return {}
+        return self._session_info
+    
+    def load_stats(self):
+        """Load statistics from JSON file, reusing the cached copy if unchanged"""
+        mtime = self.get_stats_mtime()
+        if mtime is None:
+            self._cached_stats = None
+            self._cached_mtime = None
+            return None
+        if mtime == self._cached_mtime:
+            return self._cached_stats
+        
+        for attempt in range(2):
+            try:
                 with open(self.stats_path, 'r') as f:
-                    return json.load(f)
-            else:
+                    stats = {**self.load_session_info(), **json.load(f)}
+                self._cached_stats = stats
+                self._cached_mtime = mtime
+                return stats
+            except FileNotFoundError:
                 return None
-        except Exception as e:
-            return {"error": str(e)}
+            except json.JSONDecodeError as e:
+                # Retry once in case we raced a write
+                if attempt:
+                    # Cache the error too so a broken file isn't re-parsed every tick
+                    self._cached_stats = {"error": str(e)}
+                    self._cached_mtime = mtime
+                    return self._cached_stats
+                time.sleep(0.1)
+            except Exception as e:
+                return {"error": str(e)}
     
     def display_logo(self):
         """Display ASCII art logo"""
-        logo = f"""
-{Fore.CYAN}{Style.BRIGHT}
-╔═══════════════════════════════════════════════════════════╗
-║                                                           ║
-║   ███████╗██╗     ███████╗███████╗██████╗  ██████╗       ║
-║   ██╔════╝██║     ██╔════╝██╔════╝██╔══██╗██╔════╝       ║
-║   ███████╗██║     █████╗  █████╗  ██████╔╝██║  ███╗      ║
-║   ╚════██║██║     ██╔══╝  ██╔══╝  ██╔═══╝ ██║   ██║      ║
-║   ███████║███████╗███████╗███████╗██║     ╚██████╔╝      ║
-║   ╚══════╝╚══════╝╚══════╝╚══════╝╚═╝      ╚═════╝       ║
-║                                                           ║
-║          Intelligent Productivity Protector               ║
-║                                                           ║
-╚═══════════════════════════════════════════════════════════╝
-{Style.RESET_ALL}
-"""
-        return logo
+        return LOGO
     
     def display_dashboard(self, stats):
         """Display the main dashboard"""
-        self.clear_screen()
+        # Write the whole frame at once to avoid flicker and per-line writes
+        frame = self.render_dashboard(stats)
+        self._frame_height = frame.count("\n") + 1
+        sys.stdout.write(CLEAR_SCREEN + frame + Style.RESET_ALL)
+        sys.stdout.flush()
+    
+    def render_dashboard(self, stats):
+        """Build the full dashboard frame as a single string"""
+        self._clock_visible = False
+        parts = []
         
         # Display logo
-        print(self.display_logo())
+        parts.append(f"{self.display_logo()}\n")
         
         if stats is None:
-            print(f"{Fore.RED}⚠️  Daemon not running or stats file not found!")
-            print(f"{Fore.YELLOW}Please start the daemon first: python sleepguard_daemon.py")
-            return
+            parts.append(f"{Fore.RED}⚠️  Daemon not running or stats file not found!\n")
+            parts.append(f"{Fore.YELLOW}Please start the daemon first: python sleepguard_daemon.py\n")
+            return "".join(parts)
         
         if "error" in stats:
-            print(f"{Fore.RED}Error loading stats: {stats['error']}")
-            return
+            parts.append(f"{Fore.RED}Error loading stats: {stats['error']}\n")
+            return "".join(parts)
         
         # Extract stats
         fatigue_score = stats.get('fatigue_score', 0)
-        session_duration = stats.get('session_duration_seconds', 0)
         total_keystrokes = stats.get('total_keystrokes', 0)
         keystroke_rate = stats.get('current_keystroke_rate', 0)
-        current_hour = stats.get('current_hour', datetime.now().hour)
         timestamp = stats.get('timestamp', '')
         
+        # Hour and session duration are derived from the snapshot timestamp
+        try:
+            snapshot_time = datetime.fromisoformat(timestamp)
+        except ValueError:
+            snapshot_time = datetime.now()
+        current_hour = snapshot_time.hour
+        try:
+            session_start = datetime.fromisoformat(stats.get('session_start', ''))
+            session_duration = max(0, (snapshot_time - session_start).total_seconds())
+        except ValueError:
+            session_duration = 0
+        
         # System info
-        cpu_percent = stats.get('system_info', {}).get('cpu_percent', 0)
-        memory_percent = stats.get('system_info', {}).get('memory_percent', 0)
+        cpu_percent = stats.get('cpu_percent', 0)
+        memory_percent = stats.get('memory_percent', 0)
         
         # Current time and mode
         current_time = datetime.now().strftime('%H:%M:%S')
@@ -135,82 +282,117 @@ class SleepGuardUI:
         mode_color = self.get_fatigue_color(fatigue_score)
         
         # Main stats display
-        print(f"{Fore.CYAN}{'='*60}")
-        print(f"{Fore.WHITE}Current Time: {Fore.YELLOW}{current_time}")
-        print(f"{Fore.WHITE}Last Update:  {Fore.YELLOW}{timestamp.split('T')[1][:8] if timestamp else 'N/A'}")
-        print(f"{Fore.CYAN}{'='*60}\n")
+        parts.append(f"{self._sep_eq}\n")
+        # Remember the clock's row so refresh_clock can update the time in place
+        self._clock_row = 1 + sum(part.count("\n") for part in parts)
+        self._clock_visible = True
+        parts.append(f"{Fore.WHITE}{CLOCK_LABEL}{Fore.YELLOW}{current_time}\n")
+        parts.append(f"{Fore.WHITE}Last Update:  {Fore.YELLOW}{timestamp.split('T')[1][:8] if timestamp else 'N/A'}\n")
+        parts.append(f"{self._sep_eq}\n\n")
         
         # Mode status
-        print(f"{Fore.WHITE}System Mode:  {mode_color}{mode_text:^20}{Style.RESET_ALL}\n")
+        parts.append(f"{Fore.WHITE}System Mode:  {mode_color}{mode_text:^20}{Style.RESET_ALL}\n\n")
         
         # Fatigue score with progress bar
-        print(f"{Fore.WHITE}Fatigue Score:")
+        parts.append(f"{Fore.WHITE}Fatigue Score:\n")
         fatigue_color = self.get_fatigue_color(fatigue_score)
         bar = self.draw_progress_bar(fatigue_score)
-        print(f"  {fatigue_color}{bar} {fatigue_score}%{Style.RESET_ALL}\n")
+        parts.append(f"  {fatigue_color}{bar} {fatigue_score}%{Style.RESET_ALL}\n\n")
         
         # Session info
-        print(f"{Fore.CYAN}{'─'*60}")
-        print(f"{Fore.WHITE}📊 Session Statistics:")
-        print(f"{Fore.CYAN}{'─'*60}")
-        print(f"{Fore.WHITE}  Duration:        {Fore.GREEN}{self.format_duration(session_duration)}")
-        print(f"{Fore.WHITE}  Total Keystrokes: {Fore.GREEN}{total_keystrokes:,}")
-        print(f"{Fore.WHITE}  Current Rate:     {Fore.GREEN}{keystroke_rate} keys/min")
+        parts.append(f"{self._header_lines['session']}\n")
+        parts.append(f"{Fore.WHITE}  Duration:        {Fore.GREEN}{self.format_duration(session_duration)}\n")
+        parts.append(f"{Fore.WHITE}  Total Keystrokes: {Fore.GREEN}{total_keystrokes:,}\n")
+        parts.append(f"{Fore.WHITE}  Current Rate:     {Fore.GREEN}{keystroke_rate} keys/min\n")
         
         # Keystroke rate indicator
         rate_status = "Active 🔥" if keystroke_rate > 60 else "Slow 🐌" if keystroke_rate > 20 else "Idle 😴"
         rate_color = Fore.GREEN if keystroke_rate > 60 else Fore.YELLOW if keystroke_rate > 20 else Fore.RED
-        print(f"{Fore.WHITE}  Activity:         {rate_color}{rate_status}\n")
+        parts.append(f"{Fore.WHITE}  Activity:         {rate_color}{rate_status}\n\n")
         
         # System resources
-        print(f"{Fore.CYAN}{'─'*60}")
-        print(f"{Fore.WHITE}💻 System Resources:")
-        print(f"{Fore.CYAN}{'─'*60}")
-        print(f"{Fore.WHITE}  CPU Usage:    {self.draw_progress_bar(cpu_percent, length=20)} {cpu_percent:.1f}%")
-        print(f"{Fore.WHITE}  Memory Usage: {self.draw_progress_bar(memory_percent, length=20)} {memory_percent:.1f}%\n")
+        parts.append(f"{self._header_lines['system']}\n")
+        parts.append(f"{Fore.WHITE}  CPU Usage:    {self.draw_progress_bar(cpu_percent, length=20)} {cpu_percent:.1f}%\n")
+        parts.append(f"{Fore.WHITE}  Memory Usage: {self.draw_progress_bar(memory_percent, length=20)} {memory_percent:.1f}%\n\n")
         
         # Health recommendations
-        print(f"{Fore.CYAN}{'─'*60}")
-        print(f"{Fore.WHITE} Health Recommendations:")
-        print(f"{Fore.CYAN}{'─'*60}")
+        parts.append(f"{self._header_lines['health']}\n")
         
         if fatigue_score >= 90:
-            print(f"{Fore.RED}  • STOP WORKING IMMEDIATELY!")
-            print(f"{Fore.RED}  • You are in critical fatigue zone")
-            print(f"{Fore.RED}  • Save your work and sleep NOW")
+            parts.append(f"{Fore.RED}  • STOP WORKING IMMEDIATELY!\n")
+            parts.append(f"{Fore.RED}  • You are in critical fatigue zone\n")
+            parts.append(f"{Fore.RED}  • Save your work and sleep NOW\n")
         elif fatigue_score >= 60:
-            print(f"{Fore.YELLOW}  • Take a 15-minute break")
-            print(f"{Fore.YELLOW}  • Get some water and stretch")
-            print(f"{Fore.YELLOW}  • Consider wrapping up soon")
+            parts.append(f"{Fore.YELLOW}  • Take a 15-minute break\n")
+            parts.append(f"{Fore.YELLOW}  • Get some water and stretch\n")
+            parts.append(f"{Fore.YELLOW}  • Consider wrapping up soon\n")
         elif fatigue_score >= 30:
-            print(f"{Fore.YELLOW}  • Time for a short break")
-            print(f"{Fore.YELLOW}  • Look away from screen (20-20-20 rule)")
+            parts.append(f"{Fore.YELLOW}  • Time for a short break\n")
+            parts.append(f"{Fore.YELLOW}  • Look away from screen (20-20-20 rule)\n")
         else:
-            print(f"{Fore.GREEN}  • You're doing great! Keep it up")
-            print(f"{Fore.GREEN}  • Remember to take regular breaks")
+            parts.append(f"{Fore.GREEN}  • You're doing great! Keep it up\n")
+            parts.append(f"{Fore.GREEN}  • Remember to take regular breaks\n")
         
         # Time-based warnings
         if current_hour >= 23 or current_hour < 6:
-            print(f"\n{Fore.RED}  It's late! Consider getting rest soon")
+            parts.append(f"\n{Fore.RED}  It's late! Consider getting rest soon\n")
+        
+        parts.append(f"\n{self._sep_eq}\n")
+        parts.append(f"{Fore.WHITE}Press Ctrl+C to exit\n")
+        parts.append(f"{self._sep_eq}\n")
         
-        print(f"\n{Fore.CYAN}{'='*60}")
-        print(f"{Fore.WHITE}Press Ctrl+C to exit")
-        print(f"{Fore.CYAN}{'='*60}")
+        return "".join(parts)
+    
+    def start_watcher(self, changed):
+        """Start a filesystem watcher for the stats file, or return None if unavailable"""
+        if not WATCHDOG_AVAILABLE:
+            return None
+        try:
+            handler = StatsFileHandler(self.stats_path, changed)
+            observer = Observer()
+            observer.schedule(handler, os.path.dirname(os.path.abspath(self.stats_path)))
+            observer.start()
+            return observer
+        except Exception:
+            return None
     
     def run(self, refresh_interval=2):
         """Run the dashboard with auto-refresh"""
+        changed = threading.Event()
+        observer = self.start_watcher(changed)
+        
         print(f"{Fore.CYAN}Starting SleepGuard Dashboard...")
-        print(f"{Fore.YELLOW}Refresh interval: {refresh_interval} seconds")
+        if observer:
+            print(f"{Fore.YELLOW}Watching {self.stats_path} for changes")
+        else:
+            print(f"{Fore.YELLOW}Refresh interval: {refresh_interval} seconds")
         time.sleep(1)
         
         try:
+            stats_changed = True
             while True:
-                stats = self.load_stats()
-                self.display_dashboard(stats)
-                time.sleep(refresh_interval)
+                # load_stats returns the same object while the file is unchanged
+                stats = self.load_stats() if stats_changed else self._rendered_stats
+                if stats is self._rendered_stats:
+                    # Stats unchanged since last render, only tick the clock
+                    self.refresh_clock()
+                else:
+                    self.display_dashboard(stats)
+                    self._rendered_stats = stats
+                
+                if observer:
+                    # Wake on file changes; the 1 second heartbeat only ticks the clock
+                    stats_changed = changed.wait(timeout=1.0)
+                    changed.clear()
+                else:
+                    time.sleep(refresh_interval)
         except KeyboardInterrupt:
             self.clear_screen()
             print(f"\n{Fore.CYAN}SleepGuard Dashboard closed. Stay healthy! 💚")
+        finally:
+            if observer:
+                observer.stop()
+                observer.join()
 
 if __name__ == "__main__":
     # Check if colorama is available
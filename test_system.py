@@ -9,6 +9,17 @@ import time
 import json
 from pathlib import Path
 
+# Shared daemon instance so config loading and startup output happen once
+_daemon = None
+
+def get_daemon():
+    """Create the daemon on first use and reuse it afterwards"""
+    global _daemon
+    if _daemon is None:
+        from sleepguard_daemon import SleepGuardDaemon
+        _daemon = SleepGuardDaemon()
+    return _daemon
+
 def test_imports():
     """Test if all required packages are installed"""
     print("Testing imports...")
@@ -86,8 +97,7 @@ def test_daemon_init():
     """Test if daemon can be initialized"""
     print("\nTesting daemon initialization...")
     try:
-        from sleepguard_daemon import SleepGuardDaemon
-        daemon = SleepGuardDaemon()
+        daemon = get_daemon()
         print("  ✓ Daemon initialized successfully")
         print(f"  ✓ Session start: {daemon.session_start}")
         print(f"  ✓ Fatigue score: {daemon.fatigue_score}")
@@ -100,8 +110,7 @@ def test_fatigue_calculation():
     """Test fatigue score calculation"""
     print("\nTesting fatigue calculation...")
     try:
-        from sleepguard_daemon import SleepGuardDaemon
-        daemon = SleepGuardDaemon()
+        daemon = get_daemon()
         score = daemon.calculate_fatigue_score()
         print(f"  ✓ Fatigue score calculated: {score}%")
         
@@ -115,6 +124,81 @@ def test_fatigue_calculation():
         print(f"  ✗ Failed to calculate fatigue: {e}")
         return False
 
+def test_keystroke_window():
+    """Test that keystrokes age out of the rate window"""
+    print("\nTesting keystroke rate window...")
+    daemon = get_daemon()
+    # The daemon is shared, so snapshot the keystroke state and restore it afterwards
+    daemon.drain_keystrokes()
+    saved_state = (list(daemon._buckets), daemon._bucket_sec,
+                   daemon.keystroke_count, daemon.last_keystroke_time)
+    try:
+        window = len(daemon._buckets)
+        # Start well past anything already recorded so earlier keystrokes don't count
+        base = time.monotonic() + 10 * window
+        for t in (base, base, base, base + 10, base + 10):
+            daemon._pending.put_nowait(t)
+        
+        checks = [
+            (base + 10, 5, "all keystrokes inside the window"),
+            (base + window + 5, 2, "oldest keystrokes aged out"),
+            (base + window + 20, 0, "every keystroke aged out"),
+        ]
+        for now, expected, label in checks:
+            rate = daemon.get_keystroke_rate(now=now)
+            if rate != expected:
+                print(f"  ✗ Expected rate {expected} with {label}, got {rate}")
+                return False
+            print(f"  ✓ Rate {rate} with {label}")
+        
+        # A timestamp older than the whole window must not land in a live bucket
+        daemon._pending.put_nowait(base - window)
+        rate = daemon.get_keystroke_rate(now=base + 10)
+        if rate != 5:
+            print(f"  ✗ Stale keystroke was counted: rate {rate}")
+            return False
+        print("  ✓ Stale keystroke ignored by the rate")
+        return True
+    except Exception as e:
+        print(f"  ✗ Failed keystroke window check: {e}")
+        return False
+    finally:
+        # Discard any fake keystrokes still queued, then restore the snapshot
+        daemon.drain_keystrokes()
+        buckets, daemon._bucket_sec, daemon.keystroke_count, daemon.last_keystroke_time = saved_state
+        daemon._buckets[:] = buckets
+
+def test_notification_levels():
+    """Test that only the highest newly crossed notification level fires"""
+    print("\nTesting notification levels...")
+    daemon = get_daemon()
+    saved_level = daemon.last_notification_level
+    sent = []
+    # Record notifications instead of showing them
+    daemon.send_notification = sent.append
+    try:
+        daemon.last_notification_level = 0
+        daemon.check_notifications(95)
+        if sent != [95] or daemon.last_notification_level != 90:
+            print(f"  ✗ Jump to 95 sent {sent}, level {daemon.last_notification_level}")
+            return False
+        print("  ✓ Jump from 0 to 95 sends a single level-90 notification")
+        
+        sent.clear()
+        daemon.last_notification_level = 30
+        daemon.check_notifications(60)
+        if sent != [60] or daemon.last_notification_level != 60:
+            print(f"  ✗ Step to 60 sent {sent}, level {daemon.last_notification_level}")
+            return False
+        print("  ✓ Step from 30 to 60 sends a single level-60 notification")
+        return True
+    except Exception as e:
+        print(f"  ✗ Failed notification level check: {e}")
+        return False
+    finally:
+        del daemon.send_notification
+        daemon.last_notification_level = saved_level
+
 def test_notification():
     """Test notification system"""
     print("\nTesting notification system...")
@@ -141,21 +225,21 @@ def test_ui_display():
         ui = SleepGuardUI()
         
         # Create dummy stats for testing
+        dummy_session = {
+            "session_start": "2024-01-01T10:00:00"
+        }
         dummy_stats = {
             "timestamp": "2024-01-01T12:00:00",
-            "session_start": "2024-01-01T10:00:00",
-            "session_duration_seconds": 7200,
             "total_keystrokes": 5432,
             "current_keystroke_rate": 75,
             "fatigue_score": 45,
-            "current_hour": 12,
-            "system_info": {
-                "cpu_percent": 35.5,
-                "memory_percent": 62.3
-            }
+            "cpu_percent": 35.5,
+            "memory_percent": 62.3
         }
         
         # Save dummy stats
+        with open("session_info.json", 'w') as f:
+            json.dump(dummy_session, f)
         with open("stats.json", 'w') as f:
             json.dump(dummy_stats, f)
         
@@ -180,6 +264,8 @@ def run_all_tests():
         ("Configuration File", test_config_file),
         ("Daemon Initialization", test_daemon_init),
         ("Fatigue Calculation", test_fatigue_calculation),
+        ("Keystroke Rate Window", test_keystroke_window),
+        ("Notification Levels", test_notification_levels),
         ("Notification System", test_notification),
         ("UI Display", test_ui_display),
     ]